@@ -5,7 +5,12 @@ import pandas as pd
 import numpy as np
 import plotly.graph_objs as go
 import yfinance as yf
-from datetime import date, datetime, timedelta
+import hashlib
+import os
+import tempfile
+import time
+from pathlib import Path
+from datetime import date
 
 # 設定頁面配置
 st.set_page_config(
@@ -16,26 +21,124 @@ st.set_page_config(
 # 標題
 st.title('📈 邦的股市回測系統')
 
+# 可選股票列表，包括 ETF
+STOCK_OPTIONS = ('2330', '2317', '2412', '1301', '2308', '0050', '0056')
+
+# 下載結果的磁碟快取目錄，重新啟動的 Streamlit 行程也能沿用；CACHE_TTL 為資料最長可沿用的秒數
+CACHE_DIR = Path(__file__).resolve().parent / 'cache'
+CACHE_TTL = 3600
+# 資料依序經過磁碟快取、下載結果與報酬計算兩層記憶體快取，每層最多沿用三分之一，合計不超過 CACHE_TTL
+LAYER_TTL = CACHE_TTL // 3
+
 # 功能函數
+class _UncachedResult(Exception):
+    # st.cache_data 不會記住拋出例外的呼叫；把不完整的結果包在例外中帶回，下次重新執行時會重新計算
+    def __init__(self, value):
+        super().__init__()
+        self.value = value
+
+@st.cache_resource(show_spinner=False)
+def _yf_session():
+    # 整個行程共用同一個 Session，重複使用連線而不必每次重新進行 TLS 交握
+    try:
+        from curl_cffi import requests as curl_requests
+        return curl_requests.Session(impersonate='chrome')
+    except ImportError:
+        import requests
+        session = requests.Session()
+        session.headers['User-Agent'] = 'Mozilla/5.0'
+        return session
+
+def _disk_cache_path(tickers, start, end):
+    # 以股票代碼與日期區間的雜湊值作為檔名
+    key = hashlib.md5(f"{' '.join(tickers)}_{start}_{end}".encode()).hexdigest()
+    return CACHE_DIR / f"{key}.parquet"
+
+def _read_disk_cache(path):
+    # 檔案存在且未過期才讀取；讀取失敗（例如缺少 pyarrow 或檔案損毀）就當作沒有快取
+    try:
+        if time.time() - path.stat().st_mtime < LAYER_TTL:
+            return pd.read_parquet(path)
+    except Exception:
+        pass
+    return None
+
+def _write_disk_cache(path, raw):
+    # 先寫入暫存檔再以 os.replace 替換，其他工作階段不會讀到寫到一半的檔案；寫入失敗不影響本次回傳
+    try:
+        CACHE_DIR.mkdir(exist_ok=True)
+        # 順便刪除已過期的快取檔，避免每個新的日期區間都留下一個檔案
+        now = time.time()
+        for old_path in CACHE_DIR.glob('*.parquet'):
+            try:
+                if now - old_path.stat().st_mtime >= LAYER_TTL:
+                    old_path.unlink()
+            except OSError:
+                pass
+        fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix='.tmp')
+        os.close(fd)
+        try:
+            raw.to_parquet(tmp_path, compression='zstd')
+            os.replace(tmp_path, path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+    except Exception:
+        pass
+
+@st.cache_data(ttl=LAYER_TTL, show_spinner=False)
+def _download_batch(tickers, start, end):
+    # 只快取純下載結果；記憶體快取之外再查磁碟快取，命中時不必連線
+    path = _disk_cache_path(tickers, start, end)
+    cached = _read_disk_cache(path)
+    if cached is not None:
+        return cached
+    # 多支股票合併成一次請求，由 yfinance 內部執行緒並行抓取
+    # auto_adjust=True 時 Close 即為調整後收盤價，不必再多帶一個 Adj Close 欄位
+    raw = yf.download(
+        " ".join(tickers), start=start, end=end,
+        group_by='ticker', threads=True, progress=False, auto_adjust=True, actions=False,
+        session=_yf_session()
+    )
+    # yfinance 遇到限流或無效代碼時通常回傳空值而不拋出例外；有股票沒有資料就不快取，下次重新下載
+    if _adj_close(raw, tickers).isna().all().any():
+        raise _UncachedResult(raw)
+    # 每支股票都有資料才寫入磁碟快取
+    _write_disk_cache(path, raw)
+    return raw
+
+def _adj_close(raw, tickers):
+    # 從批次下載結果一次取出所有股票的調整後收盤價（已還原的 Close），每支股票一欄
+    if raw.empty and 'Close' not in raw.columns.get_level_values(-1):
+        return pd.DataFrame(index=raw.index, columns=list(tickers), dtype='float64')
+    if isinstance(raw.columns, pd.MultiIndex):
+        return raw.xs('Close', axis=1, level=1).reindex(columns=list(tickers))
+    return raw[['Close']].set_axis(list(tickers), axis=1)
+
 def load_stock_data(stock_list, start_date, end_date):
-    data_frames = []
+    # yfinance 中，台灣股票代碼需要加上 ".TW"
+    # yfinance 會把代碼轉為大寫，這裡先統一格式，欄位名稱才能對上（例如 00631L 這類帶英文字母的代碼）
+    tickers = tuple(f"{stock.strip().upper()}.TW" for stock in stock_list)
+    try:
+        # 代碼排序、日期轉為字串，作為可雜湊且與選取順序無關的快取鍵
+        raw = _download_batch(tuple(sorted(tickers)), start_date.isoformat(), end_date.isoformat())
+    except _UncachedResult as e:
+        # 部分股票沒有資料：仍使用其餘股票，缺少的股票在下方逐一提示
+        raw = e.value
+    except Exception as e:
+        st.warning(f"下載股票代碼為 {', '.join(stock_list)} 的資料時出現錯誤: {e}")
+        return pd.DataFrame()  # 返回空的 DataFrame
+    # 使用調整後的收盤價，欄位改為股票代碼
+    adj_close = _adj_close(raw, tickers).set_axis(list(stock_list), axis=1)
+    valid_stocks = []
     for stock in stock_list:
-        # yfinance 中，台灣股票代碼需要加上 ".TW"
-        ticker = f"{stock}.TW"
-        try:
-            df = yf.download(ticker, start=start_date, end=end_date, progress=False)
-            if df.empty:
-                st.warning(f"無法下載股票代碼為 {stock} 的資料，數據為空。")
-            else:
-                # 使用調整後的收盤價
-                df = df[['Adj Close']].dropna()
-                df.rename(columns={'Adj Close': stock}, inplace=True)
-                data_frames.append(df)
-        except Exception as e:
-            st.warning(f"下載股票代碼為 {stock} 的資料時出現錯誤: {e}")
-    if data_frames:
-        # 合併所有 DataFrame，按照日期索引對齊
-        combined_df = pd.concat(data_frames, axis=1)
+        if adj_close[stock].isna().all():
+            st.warning(f"無法下載股票代碼為 {stock} 的資料，數據為空。")
+        else:
+            valid_stocks.append(stock)
+    if valid_stocks:
+        # 只保留所有股票都有交易的日期；只用於繪圖與報酬計算，float32 精度已足夠
+        combined_df = adj_close[valid_stocks].dropna().astype(np.float32)
         return combined_df
     else:
         return pd.DataFrame()  # 返回空的 DataFrame
@@ -44,25 +147,169 @@ def calculate_cumulative_returns(price_data):
     if price_data.empty:
         st.error("價格數據為空，無法計算累積收益。")
         return pd.Series(dtype='float64')
-    # 計算累積收益（百分比），保留兩位小數
-    cumulative_returns = ((price_data / price_data.iloc[0] - 1) * 100).round(2)
+    # 計算累積收益（百分比），直接在 NumPy 陣列上運算以減少 pandas 中間物件
+    arr = price_data.to_numpy(dtype=np.float32)
+    out = np.empty_like(arr)
+    np.divide(arr, arr[0], out=out)
+    out -= 1.0
+    out *= 100.0
+    # 保留完整精度，顯示時的小數位數交由 Plotly 的格式設定處理
+    cumulative_returns = pd.Series(out, index=price_data.index, name=price_data.name)
     return cumulative_returns
 
 def load_and_process_data(strategy_stocks, benchmark_stock, start_date, end_date):
-    strategy_data = load_stock_data(strategy_stocks, start_date, end_date)
-    benchmark_data = load_stock_data([benchmark_stock], start_date, end_date)
-    if strategy_data.empty:
+    # 策略股票與基準股票在同一次批次下載中取得（去除重複的代碼），日期天然對齊
+    all_stocks = list(dict.fromkeys([*strategy_stocks, benchmark_stock]))
+    price_data = load_stock_data(all_stocks, start_date, end_date)
+    # 是否每支股票都取得資料，不完整的結果不應被快取
+    complete = len(price_data.columns) == len(all_stocks)
+    strategy_columns = [stock for stock in strategy_stocks if stock in price_data.columns]
+    if not strategy_columns:
         st.error("策略股票的資料為空，請檢查股票代碼或數據來源。")
-        return None, None
-    if benchmark_data.empty:
+        return None, None, False
+    if benchmark_stock not in price_data.columns:
         st.error("基準股票的資料為空，請檢查股票代碼或數據來源。")
-        return None, None
-    # 計算策略組合的平均價格
-    strategy_price = strategy_data.mean(axis=1)
+        return None, None, False
+    strategy_data = price_data[strategy_columns]
+    benchmark_data = price_data[benchmark_stock]
+    # 計算策略組合的平均價格，直接對連續的 NumPy 陣列做列加總
+    prices = strategy_data.to_numpy(dtype=np.float32)
+    strategy_price = pd.Series(prices.sum(axis=1) * (1.0 / prices.shape[1]), index=strategy_data.index)
     # 計算累積收益
     strategy_cumulative_returns = calculate_cumulative_returns(strategy_price)
-    benchmark_cumulative_returns = calculate_cumulative_returns(benchmark_data.iloc[:, 0])
-    return strategy_cumulative_returns, benchmark_cumulative_returns
+    benchmark_cumulative_returns = calculate_cumulative_returns(benchmark_data)
+    return strategy_cumulative_returns, benchmark_cumulative_returns, complete
+
+@st.cache_data(ttl=LAYER_TTL, show_spinner=False)
+def _returns_and_rates(strategy_stocks, benchmark_stock, start_date, end_date):
+    # 累積收益與年化報酬率只取決於股票與日期，資金相關的輸入改變時直接命中快取
+    strategy_performance, benchmark_performance, complete = load_and_process_data(
+        list(strategy_stocks), benchmark_stock, start_date, end_date
+    )
+    if strategy_performance is None or benchmark_performance is None \
+            or strategy_performance.empty or benchmark_performance.empty:
+        # 失敗的結果不進快取，錯誤訊息由呼叫端顯示，下次重新執行時會重新下載
+        raise _UncachedResult((strategy_performance, benchmark_performance, None, None))
+    # 計算投資期間的年數
+    years = (end_date - start_date).days / 365.25
+    # 計算策略組合與基準股票的年化報酬率（百分比轉換為小數）
+    strategy_annual_return = (1 + float(strategy_performance.iloc[-1]) / 100) ** (1 / years) - 1
+    benchmark_annual_return = (1 + float(benchmark_performance.iloc[-1]) / 100) ** (1 / years) - 1
+    result = (strategy_performance, benchmark_performance, strategy_annual_return, benchmark_annual_return)
+    if not complete:
+        # 部分策略股票沒有資料時照常顯示其餘股票的結果，但同樣不快取
+        raise _UncachedResult(result)
+    return result
+
+def _lttb(y, n_out=1000):
+    # Largest-Triangle-Three-Buckets 降採樣，回傳要保留的點的位置索引
+    n = len(y)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    x = np.arange(n, dtype=np.float64)
+    # 首尾兩點固定保留，中間的點平均分成 n_out - 2 個桶
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # 下一個桶的平均點（最後一個桶則以終點為準）
+        next_hi = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[hi:next_hi].mean()
+        avg_y = y[hi:next_hi].mean()
+        # 挑出與上一個保留點、下一桶平均點構成最大三角形面積的點
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(area.argmax())
+        keep[i + 1] = a
+    return keep
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _build_comparison_fig(dates, strategy_values, benchmark_values, benchmark_label):
+    # 依資料內容快取圖表，只改動無關的側邊欄選項時不必重建；直接使用 NumPy 陣列繪圖
+    traces = []
+    for name, values in [('策略組合', strategy_values), (benchmark_label, benchmark_values)]:
+        # 資料點過多時先降採樣，減少傳給瀏覽器的資料量
+        keep = _lttb(values) if len(values) > 2000 else np.arange(len(values))
+        # 點數較多時改用 WebGL 繪製，少量資料則保留 SVG
+        trace_cls = go.Scattergl if len(keep) >= 1000 else go.Scatter
+        traces.append(trace_cls(
+            x=dates[keep], y=values[keep],
+            mode='lines', name=name
+        ))
+    # 一次加入所有線條，只需驗證一次圖表結構
+    fig = go.Figure()
+    fig.add_traces(traces)
+    fig.update_layout(
+        title='策略組合與基準股票的累積漲幅比較',
+        xaxis_title='日期',
+        yaxis_title='累積漲幅（%）',
+        hovermode='x unified',
+        yaxis=dict(tickformat='.2f%', hoverformat='.2f', showgrid=True),
+        legend=dict(x=0, y=1)
+    )
+    return fig
+
+def _compound_growth(monthly_rates, n_periods, initial_capital, monthly_investment):
+    # 各組月收益率排成一欄，與期數一次廣播運算，每一列是一組的總資產、本金和收益
+    r = np.asarray(monthly_rates, dtype=np.float64)[:, None]
+    # 金額全程使用 float64：float32 無法精確表示超過 2**24（約 1677 萬）的整數，使用者輸入的本金也會顯示錯誤
+    i = np.arange(n_periods, dtype=np.float64)[None, :]
+    # (1 + r) ** i - 1 以 expm1/log1p 計算，月收益率接近 0 時不會因相減而失去精度
+    growth_minus_1 = np.expm1(i * np.log1p(r))
+    # 初始資金增長
+    fv_initial = initial_capital * (1 + growth_minus_1)
+    # 每月投入增長；月收益率為 0 時，累積的只是投入期數
+    periods = np.divide(growth_minus_1, r, out=np.broadcast_to(i, growth_minus_1.shape).copy(), where=r != 0)
+    fv_monthly = monthly_investment * periods
+    total_capital = fv_initial + fv_monthly
+    principal = np.broadcast_to(initial_capital + monthly_investment * i, growth_minus_1.shape)
+    interest = total_capital - principal
+    return total_capital, principal, interest
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _build_growth_fig(growth_df, benchmark_label):
+    # 圖表只取決於輸入資料，快取同一個 Figure 物件，不需每次重新建立與序列化
+    # 期數過多時等距抽樣至最多 24 期，減少傳給瀏覽器繪製的長條數量
+    sel = np.linspace(0, len(growth_df) - 1, num=min(24, len(growth_df)), dtype=int)
+    plot_growth_df = growth_df.iloc[sel]
+    # 長條太多時不逐條標示數字
+    show_text = len(sel) <= 12
+
+    # 策略組合與基準股票的本金、收益，一次加入所有長條
+    texttemplate = '%{y:,.0f}' if show_text else None
+    bar_specs = [
+        ('策略組合本金', 'lightblue'),
+        ('策略組合收益', 'blue'),
+        (f'{benchmark_label} 本金', 'lightgreen'),
+        (f'{benchmark_label} 收益', 'green'),
+    ]
+    # 直接傳入 NumPy 陣列，Plotly 序列化時不必逐一迭代 Series
+    x = plot_growth_df['日期'].to_numpy()
+    fig = go.Figure()
+    fig.add_traces([
+        go.Bar(
+            x=x,
+            y=plot_growth_df[column].to_numpy(),
+            name=column,
+            marker_color=color,
+            texttemplate=texttemplate,
+            textposition='auto'
+        )
+        for column, color in bar_specs
+    ])
+
+    fig.update_layout(
+        barmode='group',  # 分組顯示
+        title='收益比較圖',
+        xaxis_title='日期',
+        yaxis_title='資產（元）',
+        hovermode='x unified',
+        legend=dict(x=0, y=1),
+        yaxis_tickformat=',',  # 數字不顯示科學記號或縮寫
+        yaxis_hoverformat=',.0f',  # 滑鼠提示不顯示小數點
+    )
+    return fig
 
 # 側邊欄選項
 with st.sidebar:
@@ -73,65 +320,44 @@ with st.sidebar:
     if start_date > end_date:
         st.error('開始日期不能晚於結束日期')
 
-    # 可選股票列表，包括 ETF
-    stock_options = ['2330', '2317', '2412', '1301', '2308', '0050', '0056']
     # 選擇策略股票
     strategy_stocks = st.multiselect(
         '投資組合（至少選一支股票）',
-        stock_options,
+        STOCK_OPTIONS,
         default=['2330']
     )
 
     # 讓使用者輸入比較的股票代號
-    benchmark_stock = st.text_input('輸入比較的股票', value='0050')
+    benchmark_stock = st.text_input('輸入比較的股票', value='0050').strip().upper()
 
     # 複利計算機選項
     st.subheader("複利計算機")
     use_compound = st.checkbox('使用複利計算機')
 
     if use_compound:
-        initial_capital = st.number_input('初始資金（元）', min_value=0, value=10000)
-        monthly_investment = st.number_input('每月投入（元）', min_value=0, value=1000)
+        # 放在表單中，輸入過程不觸發重新執行，按下按鈕才一次更新
+        with st.form('compound'):
+            initial_capital = st.number_input('初始資金（元）', min_value=0, value=10000)
+            monthly_investment = st.number_input('每月投入（元）', min_value=0, value=1000)
+            st.form_submit_button('更新複利計算')
 
 # 主體內容
 if strategy_stocks and benchmark_stock and start_date <= end_date:
-    # 加載和處理資料
-    strategy_performance, benchmark_performance = load_and_process_data(strategy_stocks, benchmark_stock, start_date, end_date)
+    # 加載和處理資料；失敗或不完整的結果不會被快取
+    try:
+        results = _returns_and_rates(tuple(strategy_stocks), benchmark_stock, start_date, end_date)
+    except _UncachedResult as e:
+        results = e.value
+    strategy_performance, benchmark_performance, strategy_annual_return, benchmark_annual_return = results
 
     if strategy_performance is not None and benchmark_performance is not None and not strategy_performance.empty and not benchmark_performance.empty:
-        # 對齊日期索引
-        combined_index = strategy_performance.index.intersection(benchmark_performance.index)
-        strategy_performance = strategy_performance.loc[combined_index]
-        benchmark_performance = benchmark_performance.loc[combined_index]
-
-        # 合併資料
-        comparison_df = pd.DataFrame({
-            '策略組合': strategy_performance,
-            benchmark_stock: benchmark_performance
-        })
-
-        # 將日期索引轉換為日期格式
-        comparison_df.index = comparison_df.index.date
-
         # 繪製互動式圖表
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=comparison_df.index, y=comparison_df['策略組合'],
-            mode='lines', name='策略組合'
-        ))
-        fig.add_trace(go.Scatter(
-            x=comparison_df.index, y=comparison_df[benchmark_stock],
-            mode='lines', name=benchmark_stock
-        ))
-        fig.update_layout(
-            title='策略組合與基準股票的累積漲幅比較',
-            xaxis_title='日期',
-            yaxis_title='累積漲幅（%）',
-            hovermode='x unified',
-            yaxis=dict(tickformat='.2f%', showgrid=True),
-            legend=dict(x=0, y=1)
+        fig = _build_comparison_fig(
+            strategy_performance.index.to_numpy(),
+            strategy_performance.to_numpy(),
+            benchmark_performance.to_numpy(),
+            benchmark_stock
         )
-
         st.plotly_chart(fig, use_container_width=True)
 
         # 如果使用複利計算機，進行計算
@@ -140,61 +366,33 @@ if strategy_stocks and benchmark_stock and start_date <= end_date:
             total_days = (end_date - start_date).days
             years = total_days / 365.25
 
-            # 計算策略組合的年化報酬率
-            strategy_total_return = strategy_performance.iloc[-1] / 100  # 百分比轉換為小數
-            strategy_annual_return = (1 + strategy_total_return) ** (1 / years) - 1
-
-            # 計算基準股票的年化報酬率
-            benchmark_total_return = benchmark_performance.iloc[-1] / 100  # 百分比轉換為小數
-            benchmark_annual_return = (1 + benchmark_total_return) ** (1 / years) - 1
+            # 累積漲幅（年化報酬率已在快取中算好）
+            strategy_total_return = float(strategy_performance.iloc[-1]) / 100  # 百分比轉換為小數
+            benchmark_total_return = float(benchmark_performance.iloc[-1]) / 100  # 百分比轉換為小數
 
             # 計算月收益率和總月數
             strategy_r_monthly = strategy_annual_return / 12
             benchmark_r_monthly = benchmark_annual_return / 12
             n_months = int(years * 12)
 
-            # 建立時間軸
-            dates = [start_date + timedelta(days=30*i) for i in range(n_months+1)]
-            if dates[-1] > end_date:
-                dates[-1] = end_date
-
-            # 計算策略組合的總資產、本金和收益
-            strategy_total_capital = []
-            strategy_principal = []
-            strategy_interest = []
-            for i in range(len(dates)):
-                # 初始資金增長
-                FV_initial = initial_capital * (1 + strategy_r_monthly) ** i
-                # 每月投入增長
-                if strategy_r_monthly != 0:
-                    FV_monthly = monthly_investment * (((1 + strategy_r_monthly) ** i - 1) / strategy_r_monthly)
-                else:
-                    FV_monthly = monthly_investment * i
-                total = FV_initial + FV_monthly
-                principal = initial_capital + monthly_investment * i
-                interest = total - principal
-                strategy_total_capital.append(total)
-                strategy_principal.append(principal)
-                strategy_interest.append(interest)
-
-            # 計算基準股票的總資產、本金和收益
-            benchmark_total_capital = []
-            benchmark_principal = []
-            benchmark_interest = []
-            for i in range(len(dates)):
-                # 初始資金增長
-                FV_initial = initial_capital * (1 + benchmark_r_monthly) ** i
-                # 每月投入增長
-                if benchmark_r_monthly != 0:
-                    FV_monthly = monthly_investment * (((1 + benchmark_r_monthly) ** i - 1) / benchmark_r_monthly)
-                else:
-                    FV_monthly = monthly_investment * i
-                total = FV_initial + FV_monthly
-                principal = initial_capital + monthly_investment * i
-                interest = total - principal
-                benchmark_total_capital.append(total)
-                benchmark_principal.append(principal)
-                benchmark_interest.append(interest)
+            # 建立時間軸（每 30 天一期）
+            dates = pd.date_range(start=start_date, periods=n_months + 1, freq='30D')
+            if dates[-1] > pd.Timestamp(end_date):
+                dates = dates[:-1].append(pd.DatetimeIndex([end_date]))
+
+            # 複利試算只取決於以下輸入，未改變時直接沿用上次的結果
+            compound_key = (years, strategy_r_monthly, benchmark_r_monthly, initial_capital, monthly_investment)
+            if st.session_state.get('compound_key') != compound_key:
+                st.session_state['compound_key'] = compound_key
+                st.session_state['compound_values'] = _compound_growth(
+                    (strategy_r_monthly, benchmark_r_monthly), len(dates), initial_capital, monthly_investment
+                )
+            # 策略組合與基準股票的總資產、本金和收益
+            (
+                (strategy_total_capital, benchmark_total_capital),
+                (strategy_principal, benchmark_principal),
+                (strategy_interest, benchmark_interest)
+            ) = st.session_state['compound_values']
 
             # 建立資料表
             growth_df = pd.DataFrame({
@@ -205,70 +403,16 @@ if strategy_stocks and benchmark_stock and start_date <= end_date:
                 f'{benchmark_stock} 收益': benchmark_interest
             })
 
-            # 格式化資料表，去除小數點
-            growth_df_display = growth_df.copy()
+            # 顯示資料表，只在顯示時格式化去除小數點，不複製或轉換資料型別
             cols_to_round = ['策略組合本金', '策略組合收益', f'{benchmark_stock} 本金', f'{benchmark_stock} 收益']
-            growth_df_display[cols_to_round] = growth_df_display[cols_to_round].round(0).astype(int)
-
-            # 顯示資料表
             st.subheader("收益資料表")
-            st.dataframe(growth_df_display)
-
-            # **在這裡進行修改，確保收益比較圖不顯示小數點**
-
-            # 將用於繪圖的資料也進行四捨五入，轉換為整數
-            plot_growth_df = growth_df.copy()
-            plot_growth_df[cols_to_round] = plot_growth_df[cols_to_round].round(0).astype(int)
-
-            # 繪製收益比較圖，包含本金
-            fig2 = go.Figure()
-
-            # 策略組合
-            fig2.add_trace(go.Bar(
-                x=plot_growth_df['日期'],
-                y=plot_growth_df['策略組合本金'],
-                name='策略組合本金',
-                marker_color='lightblue',
-                text=plot_growth_df['策略組合本金'],
-                textposition='auto'
-            ))
-            fig2.add_trace(go.Bar(
-                x=plot_growth_df['日期'],
-                y=plot_growth_df['策略組合收益'],
-                name='策略組合收益',
-                marker_color='blue',
-                text=plot_growth_df['策略組合收益'],
-                textposition='auto'
-            ))
-
-            # 基準股票
-            fig2.add_trace(go.Bar(
-                x=plot_growth_df['日期'],
-                y=plot_growth_df[f'{benchmark_stock} 本金'],
-                name=f'{benchmark_stock} 本金',
-                marker_color='lightgreen',
-                text=plot_growth_df[f'{benchmark_stock} 本金'],
-                textposition='auto'
-            ))
-            fig2.add_trace(go.Bar(
-                x=plot_growth_df['日期'],
-                y=plot_growth_df[f'{benchmark_stock} 收益'],
-                name=f'{benchmark_stock} 收益',
-                marker_color='green',
-                text=plot_growth_df[f'{benchmark_stock} 收益'],
-                textposition='auto'
-            ))
-
-            fig2.update_layout(
-                barmode='group',  # 分組顯示
-                title='收益比較圖',
-                xaxis_title='日期',
-                yaxis_title='資產（元）',
-                hovermode='x unified',
-                legend=dict(x=0, y=1),
-                yaxis_tickformat=',',  # 數字不顯示科學記號或縮寫
+            st.dataframe(
+                growth_df.style.format({col: '{:,.0f}' for col in cols_to_round}),
+                column_config={'日期': st.column_config.DateColumn(format='YYYY-MM-DD')}
             )
 
+            # 繪製收益比較圖，包含本金；圖上的數字同樣由 Plotly 格式化為整數
+            fig2 = _build_growth_fig(growth_df, benchmark_stock)
             st.plotly_chart(fig2, use_container_width=True)
 
             # 顯示最終結果，使用表格形式